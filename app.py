@@ -2,9 +2,8 @@ from fastapi import FastAPI, File, UploadFile, Request
 from fastapi.responses import JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
+from src.batcher import AsyncBatcher
 from src.classifier import VisionClassifier
-import shutil
-import tempfile
 import os
 import logging
 
@@ -38,6 +37,9 @@ logging.basicConfig(
 # Initialize classifier once at startup
 classifier = VisionClassifier()
 
+# Concurrent /predict requests are stacked into one batched inference
+batcher = AsyncBatcher(classifier)
+
     
 @app.get("/")
 def root():
@@ -76,13 +78,11 @@ async def predict(file: UploadFile = File(...)):
     """
 
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_path = temp_file.name
+        # Stream the upload straight to preprocessing — no disk round-trip
+        data = await file.read()
 
         # ✅ Now returns top-5 list instead of single dict
-        results = classifier.predict(temp_path, top_k=5)
-        os.remove(temp_path)
+        results = await batcher.submit(data)
 
         predicted_labels = [r['label'] for r in results]
 
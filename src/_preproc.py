@@ -0,0 +1,38 @@
+"""
+Fused image-preprocessing kernel.
+
+Converts a uint8 HWC image into a scaled float32 CHW tensor in one pass:
+one read of the uint8 pixels, one write of the float32 output, no
+Python-level temporaries. With Numba installed the loop JIT-compiles to a
+single parallel SIMD kernel; without it a fused NumPy expression does the
+same work, just with NumPy's per-channel strided access.
+
+Numba is optional — install it to enable the JIT path:
+
+    pip install numba
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def _to_chw_scaled_numpy(hwc_u8: np.ndarray, scale: np.float32, out: np.ndarray) -> None:
+    np.multiply(hwc_u8.transpose(2, 0, 1), scale, out=out)
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _to_chw_scaled_jit(hwc_u8, scale, out):
+        h, w, _ = hwc_u8.shape
+        for c in prange(3):
+            for i in range(h):
+                for j in range(w):
+                    out[c, i, j] = hwc_u8[i, j, c] * scale
+
+    to_chw_scaled = _to_chw_scaled_jit
+else:
+    to_chw_scaled = _to_chw_scaled_numpy
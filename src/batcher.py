@@ -0,0 +1,82 @@
+"""
+Dynamic request batching for the /predict endpoint.
+
+Concurrent requests are collected for up to ``max_wait`` seconds (or until
+``max_batch`` items are queued) and classified with one predict_batch
+call, amortizing ORT's per-run dispatch overhead and giving the conv/GEMM
+kernels larger tiles to work on. Under light load a request waits at most
+``max_wait`` (5 ms by default); under load, batches fill immediately.
+"""
+
+import asyncio
+
+
+class AsyncBatcher:
+    def __init__(
+        self,
+        classifier,
+        max_batch: int = 8,
+        max_wait: float = 0.005,
+        top_k: int = 5,
+    ):
+        self._classifier = classifier
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._top_k = top_k
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+    async def submit(self, image) -> list:
+        """Queue one image (path or raw bytes) and return its predictions."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            # Started lazily so the worker binds to the running event loop,
+            # and rebound if the loop changes (e.g. per-request test loops).
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        await self._queue.put((image, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._max_wait
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            images = [image for image, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    None, self._classifier.predict_batch, images, self._top_k
+                )
+            except Exception:
+                # One undecodable image fails the whole stacked run — retry
+                # each item alone so it can't take its batch-mates down.
+                for image, future in batch:
+                    try:
+                        result = await loop.run_in_executor(
+                            None, self._classifier.predict, image, self._top_k
+                        )
+                    except Exception as exc:
+                        if not future.done():
+                            future.set_exception(exc)
+                    else:
+                        if not future.done():
+                            future.set_result(result)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
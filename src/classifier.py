@@ -1,24 +1,107 @@
+import hashlib
+import io
 import json
+import mmap
 import os
+from collections import OrderedDict
 
+import cv2
 import numpy as np
 import onnxruntime as ort
 from PIL import Image
 
+from src._preproc import to_chw_scaled
+
+# PyTurboJPEG (libjpeg-turbo bindings) decodes JPEGs with SIMD DCT and can
+# downsample during decode — optional, like numba; missing package or
+# missing libturbojpeg shared library both fall back to cv2/Pillow.
+try:
+    from turbojpeg import TJPF_RGB, TurboJPEG
+    _turbo = TurboJPEG()
+except Exception:
+    _turbo = None
+
+
+MODELS_DIR = "models"
+
+# One InferenceSession per (model file, providers, shape mode), shared by
+# every VisionClassifier in the process. Each session owns its own memory
+# arena and thread pool, so duplicate sessions for the same model are pure
+# overhead — and session creation itself is the dominant startup cost.
+_SESSION_CACHE: dict = {}
+
+
+def _mmap_model_bytes(model_path: str) -> bytes:
+    """Read a model file through mmap.
+
+    Warm starts pull the weight pages straight from the page cache with no
+    buffered read() copies; cold starts fault pages in on demand.
+    """
+    with open(model_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return bytes(buf)
+
+
+def _provider_cache_key(providers: list) -> tuple:
+    """Hashable form of a providers list ((name, options) tuples allowed)."""
+    return tuple(
+        (p[0], tuple(sorted(p[1].items()))) if isinstance(p, tuple) else p
+        for p in providers
+    )
+
+
+def _cpu_has_flags(*flags: str) -> bool:
+    """Report whether /proc/cpuinfo lists all the given feature flags."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            info = f.read()
+    except OSError:
+        return False
+    return all(flag in info for flag in flags)
+
+
+def _default_model_path() -> str:
+    """Pick the fastest exported model this CPU can exploit.
+
+    INT8 first (VNNI/AMX INT8 kernels), then FP16 where the CPU has
+    native half-precision support, then the FP32 export.
+    """
+    int8_path = os.path.join(MODELS_DIR, "resnet18.int8.onnx")
+    if os.path.exists(int8_path):
+        return int8_path
+    fp16_path = os.path.join(MODELS_DIR, "resnet18.fp16.onnx")
+    if os.path.exists(fp16_path) and (
+        _cpu_has_flags("avx512_fp16") or _cpu_has_flags("amx_bf16")
+    ):
+        return fp16_path
+    return os.path.join(MODELS_DIR, "resnet18.onnx")
+
 
 class VisionClassifier:
     def __init__(
         self,
-        model_path: str = "models/resnet18.onnx",
+        model_path: str = None,
         labels_path: str = "models/labels.json",
         device: str = None,
+        providers: list = None,
     ):
         """
         Initialize VisionSense classifier using an ONNX model.
 
         Runs on CPU via onnxruntime — no PyTorch required at inference time.
         Generate the ONNX model with:  python src/export_onnx.py
+
+        By default the INT8-quantized model is used when present (see
+        export_onnx.py), falling back to the FP32 export.
+
+        ``providers`` defaults to the OpenVINO execution provider followed
+        by the default CPU one; providers not available in the installed
+        onnxruntime build are dropped, so on non-Intel hosts (or without
+        the onnxruntime-openvino package) this degrades cleanly to the
+        CPU provider.
         """
+        if model_path is None:
+            model_path = _default_model_path()
         if not os.path.exists(model_path):
             raise FileNotFoundError(
                 f"ONNX model not found at '{model_path}'. "
@@ -33,38 +116,352 @@ class VisionClassifier:
         # device attribute kept for compatibility with app.py health check
         self.device = "cpu"
 
-        self.session = ort.InferenceSession(
-            model_path, providers=["CPUExecutionProvider"]
+        # The OpenVINO EP dispatches Conv/GEMM to oneDNN kernels with better
+        # AVX-512/VNNI/AMX selection than the default CPU EP on Intel parts.
+        if providers is None:
+            providers = ["OpenVINOExecutionProvider", "CPUExecutionProvider"]
+        # Entries may be names or (name, options) tuples, as accepted by ORT.
+        available = ort.get_available_providers()
+        providers = [
+            p for p in providers
+            if (p[0] if isinstance(p, tuple) else p) in available
+        ] or ["CPUExecutionProvider"]
+        self._providers = [
+            (p, {"device_type": "CPU_FP32"})
+            if p == "OpenVINOExecutionProvider"
+            else p
+            for p in providers
+        ]
+
+        cache_key = (
+            os.path.abspath(model_path),
+            _provider_cache_key(self._providers),
+            "serve",
         )
+        self.session = _SESSION_CACHE.get(cache_key)
+        if self.session is None:
+            self.session = self._create_serving_session(model_path)
+            _SESSION_CACHE[cache_key] = self.session
         self.input_name = self.session.get_inputs()[0].name
 
+        # Original (dynamic-shape) model file, for the lazy batch session
+        self._model_path = model_path
+        self._batch_session = None
+
         with open(labels_path) as f:
             self.labels = json.load(f)
+        # Tuple copy for the hot path — immutable, slightly faster indexing
+        self._labels = tuple(self.labels)
 
-        # ImageNet normalisation constants — match preprocessing used during training
-        self._mean = np.array([0.485, 0.456, 0.406], dtype=np.float32)[:, None, None]
-        self._std  = np.array([0.229, 0.224, 0.225], dtype=np.float32)[:, None, None]
+        # Preallocated model-input buffer: the uint8→float32 conversion,
+        # 1/255 scaling and HWC→CHW transpose collapse into a single NumPy
+        # pass writing straight into this buffer, so the hot path makes no
+        # transient allocations. Reusing it across calls is safe — ORT
+        # copies the input into its own tensor on session.run() and the
+        # async /predict route serializes calls on the event loop.
+        self._scale = np.float32(1.0 / 255.0)
+        self._buf = np.empty((1, 3, 224, 224), dtype=np.float32)
 
-    def _preprocess(self, image_path: str) -> np.ndarray:
-        img = Image.open(image_path).convert("RGB").resize((224, 224), Image.BILINEAR)
-        arr = np.array(img, dtype=np.float32) / 255.0   # [H, W, C], range 0-1
-        arr = arr.transpose(2, 0, 1)                     # [C, H, W]
-        arr = (arr - self._mean) / self._std
-        return arr[None, ...]                            # [1, C, H, W]
+        # IOBinding with OrtValues aliasing the NumPy buffers above: plain
+        # session.run() copies the input feed and allocates a fresh output
+        # on every call; run_with_iobinding reuses both buffers instead.
+        # On CPU, ortvalue_from_numpy wraps the array's memory zero-copy,
+        # so _preprocess writing into _buf is all the input transfer needed.
+        # LRU cache of logits keyed by image content hash: repeat traffic
+        # (dashboard refreshes, retries, deduplicated CDN fetches) skips the
+        # whole decode + forward pass. Logits rather than result lists are
+        # cached so any top_k is served from a hit.
+        self._logits_cache: OrderedDict = OrderedDict()
+        self._cache_max = 1024
 
-    def predict(self, image_path: str, top_k: int = 5) -> list:
-        """Run image classification and return top-K predictions."""
-        input_array = self._preprocess(image_path)
-        logits = self.session.run(None, {self.input_name: input_array})[0][0]
+        self.output_name = self.session.get_outputs()[0].name
+        self._logits = np.zeros((1, len(self.labels)), dtype=np.float32)
+        # Scratch buffer for the softmax exponentials — reused across calls
+        # so the hot path allocates nothing.
+        self._exp_buf = np.empty(len(self.labels), dtype=np.float32)
+        self._io = self.session.io_binding()
+        self._in_ort = ort.OrtValue.ortvalue_from_numpy(self._buf)
+        self._out_ort = ort.OrtValue.ortvalue_from_numpy(self._logits)
+        self._io.bind_ortvalue_input(self.input_name, self._in_ort)
+        self._io.bind_ortvalue_output(self.output_name, self._out_ort)
 
-        # Numerically stable softmax
-        exp = np.exp(logits - logits.max())
-        probs = exp / exp.sum()
+        # The first run pays kernel selection, weight prepacking and arena
+        # growth (and, with numba installed, the preprocessing kernel's JIT
+        # compile) — warm everything up at construction so the first request
+        # doesn't see that latency spike.
+        to_chw_scaled(
+            np.zeros((224, 224, 3), dtype=np.uint8), self._scale, self._buf[0]
+        )
+        self.session.run_with_iobinding(self._io)
 
-        top_k = min(top_k, len(self.labels))
-        top_indices = np.argsort(probs)[::-1][:top_k]
+    def _create_serving_session(self, model_path: str) -> "ort.InferenceSession":
+        """Build the batch=1 serving session for a model file.
+
+        Graph-optimizes once, serializes the result next to the model, and
+        reuses the optimized file on subsequent starts — graph optimization
+        dominates session-creation time for ResNet-18, so warm restarts
+        skip it entirely.
+        """
+        optimized_path = model_path + ".opt.onnx"
+        opts = self._make_session_options()
 
+        # Models are loaded as mmap'd bytes; initializers stored as external
+        # data (see export_onnx.py) resolve against the model's directory.
+        opts.add_session_config_entry(
+            "session.model_external_initializers_file_folder_path",
+            os.path.dirname(os.path.abspath(model_path)),
+        )
+
+        # The serving path is always batch=1. Pinning the free batch
+        # dimension lets ORT prepack GEMM weights and pick shape-specialized
+        # kernels instead of re-planning for a dynamic shape on every run.
+        # predict_batch gets its own dynamic-shape session (created lazily).
+        opts.add_free_dimension_override_by_name("batch_size", 1)
+
+        if os.path.exists(optimized_path):
+            try:
+                return ort.InferenceSession(
+                    _mmap_model_bytes(optimized_path), opts, providers=self._providers
+                )
+            except Exception:
+                # Stale or truncated cache (e.g. ORT upgrade, killed mid-write)
+                # must never brick startup — rebuild it from the original model.
+                os.remove(optimized_path)
+
+        opts.optimized_model_filepath = optimized_path
+        return ort.InferenceSession(
+            _mmap_model_bytes(model_path), opts, providers=self._providers
+        )
+
+    @staticmethod
+    def _make_session_options() -> "ort.SessionOptions":
+        """Session options shared by the serving and batch sessions."""
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.add_session_config_entry("session.disable_prepacking", "0")
+        # Arena + memory-pattern reuse are the defaults, but they're what
+        # makes the warmup run below stick — keep them explicit.
+        opts.enable_cpu_mem_arena = True
+        opts.enable_mem_pattern = True
+
+        # Thread-pool sizing: physical cores (half the logical count) is the
+        # latency sweet spot for a single worker — the default pool sized to
+        # logical cores just adds hyperthread contention. When scaling out
+        # with several uvicorn workers set ORT_INTRA_OP_THREADS=1 so the
+        # processes don't over-subscribe the machine.
+        opts.intra_op_num_threads = int(
+            os.environ.get("ORT_INTRA_OP_THREADS", max(1, (os.cpu_count() or 2) // 2))
+        )
+        opts.inter_op_num_threads = int(os.environ.get("ORT_INTER_OP_THREADS", 1))
+        return opts
+
+    def _get_batch_session(self) -> "ort.InferenceSession":
+        """Dynamic-shape session for predict_batch, created on first use.
+
+        The serving session pins batch=1 for shape-specialized kernels, so
+        batched inference needs a separate session on the original exported
+        graph with the batch dimension left free.
+        """
+        if self._batch_session is None:
+            cache_key = (
+                os.path.abspath(self._model_path),
+                _provider_cache_key(self._providers),
+                "batch",
+            )
+            session = _SESSION_CACHE.get(cache_key)
+            if session is None:
+                opts = self._make_session_options()
+                opts.add_session_config_entry(
+                    "session.model_external_initializers_file_folder_path",
+                    os.path.dirname(os.path.abspath(self._model_path)),
+                )
+                session = ort.InferenceSession(
+                    _mmap_model_bytes(self._model_path),
+                    opts,
+                    providers=self._providers,
+                )
+                _SESSION_CACHE[cache_key] = session
+            self._batch_session = session
+        return self._batch_session
+
+    @staticmethod
+    def _read_image_bytes(image) -> bytes:
+        """Normalize a path / raw bytes / binary file object to bytes."""
+        if isinstance(image, str):
+            with open(image, "rb") as f:
+                return f.read()
+        if hasattr(image, "read"):
+            return image.read()
+        return image
+
+    def _decode_resized(self, image) -> np.ndarray:
+        """Decode an image (path, bytes or file object) to 224x224 RGB uint8.
+
+        OpenCV's decode and INTER_AREA resize run on SIMD kernels, unlike
+        stock Pillow's scalar bilinear resize. JPEGs take the TurboJPEG
+        fast path when available, which shrinks most of the way during
+        decode instead of decoding full-size pixels only to throw them away.
+        """
+        data = self._read_image_bytes(image)
+
+        if _turbo is not None:
+            try:
+                return self._decode_jpeg_turbo(data)
+            except Exception:
+                pass  # not a JPEG (or decode failed) — use the paths below
+
+        img = None
+        if data:  # cv2.imdecode asserts on an empty buffer
+            img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if img is not None:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)   # [H, W, C] uint8
+        else:
+            # OpenCV covers the common formats; fall back to Pillow for the
+            # rest (e.g. GIF) before giving up.
+            try:
+                img = np.asarray(Image.open(io.BytesIO(data)).convert("RGB"))
+            except Exception as exc:
+                raise ValueError("Could not decode image") from exc
+        return cv2.resize(img, (224, 224), interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def _decode_jpeg_turbo(data: bytes) -> np.ndarray:
+        """Decode JPEG bytes with libjpeg-turbo, downscaling during decode.
+
+        Picks the largest scaling factor that keeps both sides >= 224, so
+        the DCT does most of the shrinking before the final INTER_AREA
+        resize touches far fewer pixels.
+        """
+        if data[:2] != b"\xff\xd8":
+            raise ValueError("not a JPEG")
+        width, height = _turbo.decode_header(data)[:2]
+        factor = (1, 1)
+        for num, denom in sorted(
+            _turbo.scaling_factors, key=lambda f: f[0] / f[1]
+        ):
+            if width * num // denom >= 224 and height * num // denom >= 224:
+                factor = (num, denom)
+                break
+        rgb = _turbo.decode(data, pixel_format=TJPF_RGB, scaling_factor=factor)
+        return cv2.resize(rgb, (224, 224), interpolation=cv2.INTER_AREA)
+
+    def _preprocess(self, image) -> np.ndarray:
+        # ImageNet mean/std normalisation is baked into the exported graph
+        # (see export_onnx.py), so the model input is just [0, 1] RGB.
+        # One fused read of the uint8 HWC image, one write of float32 CHW.
+        img = self._decode_resized(image)
+        to_chw_scaled(img, self._scale, self._buf[0])
+        return self._buf                                 # [1, C, H, W]
+
+    def predict(self, image, top_k: int = 5) -> list:
+        """Run image classification and return top-K predictions.
+
+        ``image`` may be a file path, raw encoded bytes, or a binary file
+        object — uploads can stream straight from memory with no disk
+        round-trip.
+        """
+        data = self._read_image_bytes(image)
+        cache_key = hashlib.blake2b(data, digest_size=16).digest()
+
+        logits = self._logits_cache.get(cache_key)
+        if logits is not None:
+            self._logits_cache.move_to_end(cache_key)
+        else:
+            self._preprocess(data)         # writes into the bound input buffer
+            self.session.run_with_iobinding(self._io)
+            logits = self._logits[0].copy()
+            self._logits_cache[cache_key] = logits
+            if len(self._logits_cache) > self._cache_max:
+                self._logits_cache.popitem(last=False)
+
+        # Softmax is monotonic, so the top-K ranking comes straight from the
+        # raw logits: an O(N) partition plus a sort of just the K selected
+        # entries, with no normalization pass over all 1000 classes.
+        top_k = min(top_k, len(self._labels))
+        part = np.argpartition(-logits, top_k - 1)[:top_k]
+        top_indices = part[np.argsort(-logits[part])]
+
+        # Numerically stable softmax computed in-place in a reusable scratch
+        # buffer: one subtract pass, one exp pass, no temporaries, and the
+        # exponentials are reused for the K reported confidences.
+        np.subtract(logits, logits.max(), out=self._exp_buf)
+        np.exp(self._exp_buf, out=self._exp_buf)
+        denom = self._exp_buf.sum()
+        # One NumPy call converts all K confidences (via float64, so the
+        # rounded values serialize cleanly) instead of boxing them one at
+        # a time with per-element round(float(...)).
+        confs = (
+            (self._exp_buf[top_indices] / denom)
+            .astype(np.float64)
+            .round(4)
+            .tolist()
+        )
         return [
-            {"label": self.labels[idx], "confidence": round(float(probs[idx]), 4)}
-            for idx in top_indices
+            {"label": self._labels[i], "confidence": c}
+            for i, c in zip(top_indices.tolist(), confs)
         ]
+
+    def predict_bytes(self, data: bytes, top_k: int = 5) -> list:
+        """Classify raw encoded image bytes — no file needed."""
+        return self.predict(data, top_k=top_k)
+
+    def predict_batch(self, images: list, top_k: int = 5) -> list:
+        """Classify several images with one session run.
+
+        Batching amortizes the per-call dispatch and op-scheduling overhead
+        and lets the conv/GEMM kernels work on larger tiles, so throughput
+        scales better than calling predict() in a loop. Each entry may be a
+        path, bytes or file object; returns one top-K list (same shape as
+        predict()) per input, in order.
+        """
+        if not images:
+            return []
+
+        # Serve repeat content from the logits cache (the /predict route
+        # funnels everything through here via the batcher) and run the
+        # session only for the misses.
+        datas = [self._read_image_bytes(image) for image in images]
+        keys = [hashlib.blake2b(d, digest_size=16).digest() for d in datas]
+        all_logits = [None] * len(datas)
+        misses = []
+        for i, key in enumerate(keys):
+            cached = self._logits_cache.get(key)
+            if cached is not None:
+                self._logits_cache.move_to_end(key)
+                all_logits[i] = cached
+            else:
+                misses.append(i)
+
+        if misses:
+            batch = np.empty((len(misses), 3, 224, 224), dtype=np.float32)
+            for j, i in enumerate(misses):
+                to_chw_scaled(self._decode_resized(datas[i]), self._scale, batch[j])
+            miss_logits = self._get_batch_session().run(
+                None, {self.input_name: batch}
+            )[0]
+            for j, i in enumerate(misses):
+                row = miss_logits[j].copy()
+                self._logits_cache[keys[i]] = row
+                if len(self._logits_cache) > self._cache_max:
+                    self._logits_cache.popitem(last=False)
+                all_logits[i] = row
+
+        logits = np.stack(all_logits)
+
+        # Vectorized softmax over the whole batch, numerically stable per row
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs = exp / exp.sum(axis=1, keepdims=True)
+
+        top_k = min(top_k, len(self.labels))
+        part = np.argpartition(-probs, top_k - 1, axis=1)[:, :top_k]
+
+        results = []
+        for row_probs, row_idx in zip(probs, part):
+            idx = row_idx[np.argsort(-row_probs[row_idx])]
+            confs = row_probs[idx].astype(np.float64).round(4).tolist()
+            results.append([
+                {"label": self._labels[j], "confidence": c}
+                for j, c in zip(idx.tolist(), confs)
+            ])
+        return results
@@ -9,6 +9,10 @@ This script is also executed automatically during `docker build` via the
 multi-stage Dockerfile.  The exported ONNX model is then copied into the
 slim runtime image so PyTorch is not a runtime dependency.
 
+ImageNet normalization is baked into the exported graph (the model takes
+[0, 1] RGB input) — models exported before this was the case must be
+re-exported or predictions will be silently wrong.
+
 Fine-tuned model support
 ------------------------
 If models/resnet18_finetuned.pth exists, the fine-tuned CIFAR-10 weights are
@@ -18,11 +22,59 @@ exported.  Otherwise the pretrained ImageNet ResNet-18 weights are used.
 import json
 import os
 
+import numpy as np
+import onnx
 import torch
 import torch.nn as nn
+from onnxconverter_common import float16
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    QuantFormat,
+    QuantType,
+    quantize_static,
+)
 from torchvision.models import ResNet18_Weights, resnet18
 
 
+class SyntheticCalibrationReader(CalibrationDataReader):
+    """Feed ~100 synthetic [0, 1]-range tensors to calibrate activation ranges.
+
+    Static quantization needs representative activations to pick scales.
+    Uniform noise in the model's input range is enough to produce sane
+    ranges for classification; swap in real images for maximum accuracy.
+    """
+
+    def __init__(self, input_name: str = "input", num_samples: int = 100):
+        rng = np.random.default_rng(seed=0)
+        self._batches = iter(
+            {input_name: rng.random((1, 3, 224, 224), dtype=np.float32)}
+            for _ in range(num_samples)
+        )
+
+    def get_next(self):
+        return next(self._batches, None)
+
+
+class NormalizedModel(nn.Module):
+    """Wrap the classifier so ImageNet normalization lives inside the graph.
+
+    The exported model takes images scaled to [0, 1]; the leading Sub/Mul
+    nodes are constant-folded into the first Conv by ORT's graph optimizer,
+    so the per-image normalization pass disappears from Python preprocessing.
+    """
+
+    def __init__(self, base: nn.Module):
+        super().__init__()
+        self.base = base
+        mean = torch.tensor([0.485, 0.456, 0.406]).view(1, 3, 1, 1)
+        std = torch.tensor([0.229, 0.224, 0.225]).view(1, 3, 1, 1)
+        self.register_buffer("mean", mean)
+        self.register_buffer("inv_std", 1.0 / std)
+
+    def forward(self, x):
+        return self.base((x - self.mean) * self.inv_std)
+
+
 def export(
     pth_path: str = "models/resnet18_finetuned.pth",
     output_dir: str = "models",
@@ -47,6 +99,7 @@ def export(
         labels = list(weights.meta["categories"])
         print("No fine-tuned model found — exporting pretrained ImageNet ResNet-18.")
 
+    model = NormalizedModel(model)
     model.eval()
 
     onnx_path = os.path.join(output_dir, "resnet18.onnx")
@@ -59,8 +112,53 @@ def export(
         dynamic_axes={"input": {0: "batch_size"}, "output": {0: "batch_size"}},
         opset_version=11,
     )
+    # Keep the weights in one external .data file next to the model: at
+    # load time the initializers can be mmap'd (page-cached, zero-copy)
+    # instead of being deserialized out of the protobuf, which is most of
+    # the cold-start I/O for a ~45 MB model.
+    model_proto = onnx.load(onnx_path)
+    data_path = onnx_path + ".data"
+    if os.path.exists(data_path):
+        os.remove(data_path)  # onnx.save appends to an existing data file
+    onnx.save(
+        model_proto,
+        onnx_path,
+        save_as_external_data=True,
+        all_tensors_to_one_file=True,
+        location=os.path.basename(data_path),
+    )
     print(f"ONNX model saved → {onnx_path}")
 
+    # INT8 quantization: modern x86 CPUs (AVX512-VNNI / AMX) run INT8 conv
+    # and matmul 2-4x faster than FP32, and weight bandwidth is halved.
+    # U8 activations x S8 weights matches the VPDPBUSD instruction form.
+    # QOperator format emits QLinearConv/QLinearMatMul nodes directly (no
+    # Q/DQ pairs left for the runtime to fuse), and per-channel symmetric
+    # weight scales keep accuracy without reduce_range's 7-bit fallback.
+    int8_path = os.path.join(output_dir, "resnet18.int8.onnx")
+    quantize_static(
+        onnx_path,
+        int8_path,
+        SyntheticCalibrationReader(),
+        quant_format=QuantFormat.QOperator,
+        per_channel=True,
+        reduce_range=False,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    print(f"INT8 model saved → {int8_path}")
+
+    # FP16 halves weight bandwidth and lets CPUs with AVX512-FP16 / AMX-BF16
+    # dispatch native half-precision kernels; accuracy loss is negligible
+    # for classification. keep_io_types leaves the float32 input/output
+    # interface unchanged so the classifier needs no special handling.
+    fp16_path = os.path.join(output_dir, "resnet18.fp16.onnx")
+    model_fp16 = float16.convert_float_to_float16(
+        onnx.load(onnx_path), keep_io_types=True
+    )
+    onnx.save(model_fp16, fp16_path)
+    print(f"FP16 model saved → {fp16_path}")
+
     labels_path = os.path.join(output_dir, "labels.json")
     with open(labels_path, "w") as f:
         json.dump(labels, f)
@@ -28,6 +28,9 @@ MOCK_PREDICTIONS = [
 
 mock_classifier = MagicMock()
 mock_classifier.predict.return_value = MOCK_PREDICTIONS
+mock_classifier.predict_batch.side_effect = lambda paths, top_k=5: [
+    MOCK_PREDICTIONS for _ in paths
+]
 mock_classifier.device = "cpu"
 
 with patch("src.classifier.VisionClassifier", return_value=mock_classifier):
@@ -201,14 +204,14 @@ def test_predict_result_items_have_label_and_confidence():
 
 
 def test_predict_calls_classifier():
-    """Confirm the route delegates to the VisionClassifier.predict method."""
-    mock_classifier.predict.reset_mock()
+    """Confirm the route delegates to the classifier via the batcher."""
+    mock_classifier.predict_batch.reset_mock()
     png_bytes = _make_png_bytes()
     client.post(
         "/predict",
         files={"file": ("test.png", io.BytesIO(png_bytes), "image/png")},
     )
-    mock_classifier.predict.assert_called_once()
+    mock_classifier.predict_batch.assert_called_once()
 
 
 # ---------------------------------------------------------------------------
@@ -217,6 +220,8 @@ def test_predict_calls_classifier():
 
 def test_predict_with_corrupt_data_returns_500():
     """Sending non-image bytes should trigger the exception handler."""
+    # Batched run fails and the per-item retry fails the same way
+    mock_classifier.predict_batch.side_effect = Exception("cannot identify image file")
     mock_classifier.predict.side_effect = Exception("cannot identify image file")
     response = client.post(
         "/predict",
@@ -229,9 +234,13 @@ def test_predict_with_corrupt_data_returns_500():
     # Restore normal behaviour for subsequent tests
     mock_classifier.predict.side_effect = None
     mock_classifier.predict.return_value = MOCK_PREDICTIONS
+    mock_classifier.predict_batch.side_effect = lambda paths, top_k=5: [
+        MOCK_PREDICTIONS for _ in paths
+    ]
 
 
 def test_predict_error_body_contains_message():
+    mock_classifier.predict_batch.side_effect = ValueError("bad input")
     mock_classifier.predict.side_effect = ValueError("bad input")
     response = client.post(
         "/predict",
@@ -242,3 +251,6 @@ def test_predict_error_body_contains_message():
     assert len(body["error"]) > 0
     mock_classifier.predict.side_effect = None
     mock_classifier.predict.return_value = MOCK_PREDICTIONS
+    mock_classifier.predict_batch.side_effect = lambda paths, top_k=5: [
+        MOCK_PREDICTIONS for _ in paths
+    ]
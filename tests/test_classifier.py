@@ -7,6 +7,7 @@ and the predict() softmax + top-k logic.
 """
 
 import json
+import os
 
 import numpy as np
 import pytest
@@ -42,7 +43,10 @@ def mock_session():
     session = MagicMock()
     mock_input = MagicMock()
     mock_input.name = "input"
+    mock_output = MagicMock()
+    mock_output.name = "output"
     session.get_inputs.return_value = [mock_input]
+    session.get_outputs.return_value = [mock_output]
     session.run.return_value = [MOCK_LOGITS]
     return session
 
@@ -53,6 +57,15 @@ def classifier(model_files, mock_session):
     onnx_path, labels_path = model_files
     with patch("onnxruntime.InferenceSession", return_value=mock_session):
         clf = VisionClassifier(model_path=onnx_path, labels_path=labels_path)
+
+    # Discard the construction-time warmup call, then emulate
+    # run_with_iobinding writing into the bound output buffer in-place.
+    mock_session.run_with_iobinding.reset_mock()
+
+    def _fake_run(io_binding):
+        clf._logits[:] = MOCK_LOGITS
+
+    mock_session.run_with_iobinding.side_effect = _fake_run
     return clf
 
 
@@ -94,6 +107,148 @@ def test_raises_if_labels_missing(tmp_path):
             )
 
 
+# ---------------------------------------------------------------------------
+# Initialisation — default model path resolution
+# ---------------------------------------------------------------------------
+
+def test_default_model_path_prefers_int8(tmp_path, monkeypatch):
+    from src.classifier import _default_model_path
+    monkeypatch.chdir(tmp_path)
+    models = tmp_path / "models"
+    models.mkdir()
+    (models / "resnet18.onnx").write_bytes(b"placeholder")
+    (models / "resnet18.int8.onnx").write_bytes(b"placeholder")
+    assert _default_model_path() == os.path.join("models", "resnet18.int8.onnx")
+
+
+def test_default_model_path_falls_back_to_fp32(tmp_path, monkeypatch):
+    from src.classifier import _default_model_path
+    monkeypatch.chdir(tmp_path)
+    assert _default_model_path() == os.path.join("models", "resnet18.onnx")
+
+
+def test_default_model_path_uses_fp16_on_capable_cpu(tmp_path, monkeypatch):
+    import src.classifier as classifier_module
+    monkeypatch.chdir(tmp_path)
+    models = tmp_path / "models"
+    models.mkdir()
+    (models / "resnet18.onnx").write_bytes(b"placeholder")
+    (models / "resnet18.fp16.onnx").write_bytes(b"placeholder")
+    monkeypatch.setattr(classifier_module, "_cpu_has_flags", lambda *f: True)
+    assert classifier_module._default_model_path() == os.path.join(
+        "models", "resnet18.fp16.onnx"
+    )
+
+
+def test_default_model_path_skips_fp16_without_cpu_support(tmp_path, monkeypatch):
+    import src.classifier as classifier_module
+    monkeypatch.chdir(tmp_path)
+    models = tmp_path / "models"
+    models.mkdir()
+    (models / "resnet18.onnx").write_bytes(b"placeholder")
+    (models / "resnet18.fp16.onnx").write_bytes(b"placeholder")
+    monkeypatch.setattr(classifier_module, "_cpu_has_flags", lambda *f: False)
+    assert classifier_module._default_model_path() == os.path.join(
+        "models", "resnet18.onnx"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Initialisation — optimized-graph cache
+# ---------------------------------------------------------------------------
+
+def test_init_serializes_optimized_graph_on_first_run(model_files, mock_session):
+    """First start: load the original model bytes, write <model>.opt.onnx."""
+    from src.classifier import VisionClassifier
+    onnx_path, labels_path = model_files
+    with patch("onnxruntime.InferenceSession", return_value=mock_session) as sess:
+        VisionClassifier(model_path=onnx_path, labels_path=labels_path)
+    loaded_bytes, opts = sess.call_args[0][:2]
+    assert loaded_bytes == b"placeholder"
+    assert opts.optimized_model_filepath == onnx_path + ".opt.onnx"
+
+
+def test_init_loads_optimized_graph_when_present(model_files, mock_session, tmp_path):
+    """Warm restart: the serialized optimized model is loaded directly."""
+    from src.classifier import VisionClassifier
+    onnx_path, labels_path = model_files
+    optimized = tmp_path / "resnet18.onnx.opt.onnx"
+    optimized.write_bytes(b"optimized placeholder")
+
+    with patch("onnxruntime.InferenceSession", return_value=mock_session) as sess:
+        VisionClassifier(model_path=onnx_path, labels_path=labels_path)
+    assert sess.call_args[0][0] == b"optimized placeholder"
+
+
+def test_session_cache_shares_sessions_per_model(model_files, mock_session):
+    """Two classifiers on the same model reuse one InferenceSession."""
+    from src.classifier import VisionClassifier
+    onnx_path, labels_path = model_files
+    with patch("onnxruntime.InferenceSession", return_value=mock_session) as sess:
+        a = VisionClassifier(model_path=onnx_path, labels_path=labels_path)
+        b = VisionClassifier(model_path=onnx_path, labels_path=labels_path)
+    assert a.session is b.session
+    assert sess.call_count == 1
+
+
+def test_unavailable_providers_are_dropped(model_files, mock_session):
+    """OpenVINO is preferred but filtered out when the build lacks it."""
+    from src.classifier import VisionClassifier
+    onnx_path, labels_path = model_files
+    with patch("onnxruntime.InferenceSession", return_value=mock_session) as sess:
+        with patch(
+            "onnxruntime.get_available_providers",
+            return_value=["CPUExecutionProvider"],
+        ):
+            VisionClassifier(model_path=onnx_path, labels_path=labels_path)
+    assert sess.call_args[1]["providers"] == ["CPUExecutionProvider"]
+
+
+def test_openvino_provider_used_when_available(model_files, mock_session):
+    from src.classifier import VisionClassifier
+    onnx_path, labels_path = model_files
+    with patch("onnxruntime.InferenceSession", return_value=mock_session) as sess:
+        with patch(
+            "onnxruntime.get_available_providers",
+            return_value=["OpenVINOExecutionProvider", "CPUExecutionProvider"],
+        ):
+            VisionClassifier(model_path=onnx_path, labels_path=labels_path)
+    assert sess.call_args[1]["providers"] == [
+        ("OpenVINOExecutionProvider", {"device_type": "CPU_FP32"}),
+        "CPUExecutionProvider",
+    ]
+
+
+def test_intra_op_threads_env_override(model_files, mock_session, monkeypatch):
+    """ORT_INTRA_OP_THREADS controls the session's intra-op thread pool."""
+    from src.classifier import VisionClassifier
+    monkeypatch.setenv("ORT_INTRA_OP_THREADS", "3")
+    onnx_path, labels_path = model_files
+    with patch("onnxruntime.InferenceSession", return_value=mock_session) as sess:
+        VisionClassifier(model_path=onnx_path, labels_path=labels_path)
+    opts = sess.call_args[0][1]
+    assert opts.intra_op_num_threads == 3
+    assert opts.inter_op_num_threads == 1
+
+
+def test_init_rebuilds_corrupt_optimized_graph(model_files, mock_session, tmp_path):
+    """A stale/corrupt cache file is deleted and regenerated, not fatal."""
+    from src.classifier import VisionClassifier
+    onnx_path, labels_path = model_files
+    optimized = tmp_path / "resnet18.onnx.opt.onnx"
+    optimized.write_bytes(b"corrupt")
+
+    # First call (the cache file) fails to parse; second (original) succeeds.
+    with patch(
+        "onnxruntime.InferenceSession",
+        side_effect=[Exception("Protobuf parsing failed"), mock_session],
+    ) as sess:
+        clf = VisionClassifier(model_path=onnx_path, labels_path=labels_path)
+    assert clf.session is mock_session
+    assert sess.call_args[0][0] == b"placeholder"
+    assert not optimized.exists()
+
+
 # ---------------------------------------------------------------------------
 # Initialisation — attributes
 # ---------------------------------------------------------------------------
@@ -120,17 +275,43 @@ def test_preprocess_output_dtype(classifier, sample_image):
     assert arr.dtype == np.float32
 
 
-def test_preprocess_produces_negative_values(classifier, sample_image):
-    """ImageNet normalisation shifts some channels below zero."""
+def test_preprocess_output_is_zero_to_one(classifier, sample_image):
+    """Normalisation lives in the ONNX graph — Python emits [0, 1] RGB."""
     arr = classifier._preprocess(sample_image)
-    assert arr.min() < 0
+    assert arr.min() >= 0.0
+    assert arr.max() <= 1.0
 
 
-def test_preprocess_produces_positive_values(classifier, sample_image):
+def test_preprocess_output_is_not_all_zero(classifier, sample_image):
     arr = classifier._preprocess(sample_image)
     assert arr.max() > 0
 
 
+def test_preprocess_reuses_input_buffer(classifier, sample_image):
+    """The preallocated input buffer is reused — no per-call allocation."""
+    first = classifier._preprocess(sample_image)
+    second = classifier._preprocess(sample_image)
+    assert first is second
+
+
+def test_decode_resized_handles_jpeg(classifier, tmp_path):
+    """JPEG decodes to 224x224 RGB via whichever decoder is available."""
+    path = tmp_path / "test.jpg"
+    Image.new("RGB", (640, 480), color=(10, 200, 30)).save(str(path), quality=90)
+    img = classifier._decode_resized(str(path))
+    assert img.shape == (224, 224, 3)
+    assert img.dtype == np.uint8
+    # Mostly-green image survives decode+resize with channels in RGB order
+    assert img[:, :, 1].mean() > img[:, :, 0].mean()
+
+
+def test_preprocess_raises_on_undecodable_file(classifier, tmp_path):
+    bad = tmp_path / "not_an_image.png"
+    bad.write_bytes(b"not-an-image")
+    with pytest.raises(ValueError, match="Could not decode"):
+        classifier._preprocess(str(bad))
+
+
 # ---------------------------------------------------------------------------
 # predict — return structure
 # ---------------------------------------------------------------------------
@@ -164,6 +345,134 @@ def test_predict_confidence_is_float(classifier, sample_image):
         assert isinstance(item["confidence"], float)
 
 
+# ---------------------------------------------------------------------------
+# predict_batch
+# ---------------------------------------------------------------------------
+
+# Two rows with different winners: index 3 ("cat") and index 0 ("airplane")
+MOCK_BATCH_LOGITS = np.array(
+    [[0.1, 0.2, 0.3, 5.0, 0.4],
+     [4.0, 0.2, 0.3, 0.1, 0.4]],
+    dtype=np.float32,
+)
+
+
+@pytest.fixture
+def batch_classifier(classifier, mock_session):
+    """Classifier with the lazy dynamic-batch session already injected."""
+    classifier._batch_session = mock_session
+    return classifier
+
+
+def test_batch_session_created_lazily(classifier, mock_session):
+    assert classifier._batch_session is None
+    with patch("onnxruntime.InferenceSession", return_value=mock_session):
+        session = classifier._get_batch_session()
+    assert session is mock_session
+    assert classifier._batch_session is mock_session
+
+
+def test_predict_batch_empty_list(batch_classifier, mock_session):
+    assert batch_classifier.predict_batch([]) == []
+    mock_session.run.assert_not_called()
+
+
+def test_predict_batch_returns_one_result_per_image(batch_classifier, sample_image, mock_session):
+    mock_session.run.return_value = [MOCK_BATCH_LOGITS]
+    results = batch_classifier.predict_batch([sample_image, sample_image])
+    assert len(results) == 2
+    assert all(len(r) == 5 for r in results)
+
+
+def test_predict_batch_single_session_run(batch_classifier, sample_image, mock_session):
+    mock_session.run.return_value = [MOCK_BATCH_LOGITS]
+    batch_classifier.predict_batch([sample_image, sample_image])
+    mock_session.run.assert_called_once()
+    batch = mock_session.run.call_args[0][1]["input"]
+    assert batch.shape == (2, 3, 224, 224)
+
+
+def test_predict_batch_per_row_winners(batch_classifier, sample_image, mock_session):
+    mock_session.run.return_value = [MOCK_BATCH_LOGITS]
+    results = batch_classifier.predict_batch([sample_image, sample_image])
+    assert results[0][0]["label"] == "cat"
+    assert results[1][0]["label"] == "airplane"
+
+
+def test_predict_batch_respects_top_k(batch_classifier, sample_image, mock_session):
+    mock_session.run.return_value = [MOCK_BATCH_LOGITS]
+    results = batch_classifier.predict_batch([sample_image, sample_image], top_k=2)
+    assert all(len(r) == 2 for r in results)
+
+
+def test_predict_batch_serves_repeat_content_from_cache(batch_classifier, sample_image, mock_session):
+    mock_session.run.return_value = [MOCK_BATCH_LOGITS]
+    batch_classifier.predict_batch([sample_image, sample_image])
+    mock_session.run.reset_mock()
+    batch_classifier.predict_batch([sample_image])
+    mock_session.run.assert_not_called()
+
+
+def test_predict_batch_confidences_descending(batch_classifier, sample_image, mock_session):
+    mock_session.run.return_value = [MOCK_BATCH_LOGITS]
+    for row in batch_classifier.predict_batch([sample_image, sample_image]):
+        confs = [r["confidence"] for r in row]
+        assert confs == sorted(confs, reverse=True)
+
+
+# ---------------------------------------------------------------------------
+# _preproc kernel
+# ---------------------------------------------------------------------------
+
+def test_to_chw_scaled_matches_reference():
+    """The fused kernel (JIT or NumPy) equals the naive reference."""
+    from src._preproc import to_chw_scaled
+    rng = np.random.default_rng(seed=0)
+    hwc = rng.integers(0, 256, size=(224, 224, 3), dtype=np.uint8)
+    out = np.empty((3, 224, 224), dtype=np.float32)
+    to_chw_scaled(hwc, np.float32(1.0 / 255.0), out)
+    expected = hwc.transpose(2, 0, 1).astype(np.float32) / 255.0
+    np.testing.assert_allclose(out, expected, rtol=1e-6)
+
+
+# ---------------------------------------------------------------------------
+# predict — content-hash logits cache
+# ---------------------------------------------------------------------------
+
+def test_predict_repeat_image_served_from_cache(classifier, sample_image, mock_session):
+    first = classifier.predict(sample_image)
+    second = classifier.predict(sample_image)
+    assert first == second
+    mock_session.run_with_iobinding.assert_called_once()
+
+
+def test_predict_cache_serves_any_top_k(classifier, sample_image, mock_session):
+    classifier.predict(sample_image, top_k=5)
+    assert len(classifier.predict(sample_image, top_k=2)) == 2
+    mock_session.run_with_iobinding.assert_called_once()
+
+
+def test_predict_bytes_matches_path_predict(classifier, sample_image, mock_session):
+    """Raw bytes and a file path of the same image give the same result."""
+    with open(sample_image, "rb") as f:
+        data = f.read()
+    assert classifier.predict_bytes(data) == classifier.predict(sample_image)
+
+
+def test_predict_accepts_file_object(classifier, sample_image):
+    with open(sample_image, "rb") as f:
+        results = classifier.predict(f)
+    assert results[0]["label"] == "cat"
+
+
+def test_predict_changed_content_reruns_inference(classifier, sample_image, tmp_path, mock_session):
+    classifier.predict(sample_image)
+    other = tmp_path / "other.png"
+    Image.new("RGB", (64, 64), color=(1, 2, 3)).save(str(other))
+    classifier.predict(str(other))
+    assert mock_session.run_with_iobinding.call_count == 2
+
+
 # ---------------------------------------------------------------------------
 # predict — correctness of softmax + top-k logic
 # ---------------------------------------------------------------------------
@@ -192,11 +501,19 @@ def test_predict_confidence_values_are_between_0_and_1(classifier, sample_image)
 
 def test_predict_calls_onnx_session(classifier, sample_image, mock_session):
     classifier.predict(sample_image)
-    mock_session.run.assert_called_once()
+    mock_session.run_with_iobinding.assert_called_once()
 
 
-def test_predict_passes_correct_input_name(classifier, sample_image, mock_session):
-    classifier.predict(sample_image)
-    call_kwargs = mock_session.run.call_args[0]
-    feed_dict = call_kwargs[1]
-    assert "input" in feed_dict
+def test_init_runs_warmup_inference(model_files, mock_session):
+    """Construction performs one inference so the first request is warm."""
+    from src.classifier import VisionClassifier
+    onnx_path, labels_path = model_files
+    with patch("onnxruntime.InferenceSession", return_value=mock_session):
+        VisionClassifier(model_path=onnx_path, labels_path=labels_path)
+    mock_session.run_with_iobinding.assert_called_once()
+
+
+def test_init_binds_input_and_output_names(classifier, mock_session):
+    io = mock_session.io_binding.return_value
+    assert io.bind_ortvalue_input.call_args[0][0] == "input"
+    assert io.bind_ortvalue_output.call_args[0][0] == "output"